@@ -0,0 +1,11 @@
+from .shard import ShardWriter, ShardedDataset, ShardShuffleSampler, pack_image_folder
+from .augment import AugmentPipeline, register_augment
+
+__all__ = [
+    "ShardWriter",
+    "ShardedDataset",
+    "ShardShuffleSampler",
+    "pack_image_folder",
+    "AugmentPipeline",
+    "register_augment",
+]
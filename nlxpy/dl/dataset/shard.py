@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nlxpy.dl.dataset.shard
+========
+
+Desc: Memory-mapped sharded dataset format and reader.
+
+Samples are packed into fixed-size shards, each one a contiguous data file
+plus an offset/length/label index::
+
+    root/
+      meta.json
+      shard_00000.bin       # concatenated sample bytes
+      shard_00000.idx.npy   # structured array: offset, length, label
+
+Samples are either encoded bytes (e.g. JPEG, decoded by a user callable) or
+numpy arrays of one fixed shape/dtype, which are read back without decoding.
+
+Usage::
+
+    with ShardWriter("data/train") as w:
+        for img, label in samples:
+            w.write(img, label)
+    ds = ShardedDataset("data/train")
+    loader = DataLoader(ds, batch_size=64, sampler=ShardShuffleSampler(ds), num_workers=8)
+
+Author: Neolux Lee
+
+Date: 2025-07-12
+
+Email: neolux_lee@outlook.com
+
+Ver: 0.0.1
+"""
+import os
+import json
+import logging
+from typing import Callable
+
+import numpy as np
+from torch.utils.data import Dataset, Sampler
+
+from ..rand import get_random_seed
+
+META_FILE = "meta.json"
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4"), ("label", "<i8")])
+
+
+class ShardWriter:
+    """
+    Pack samples into shards of about ``shard_bytes`` each.
+    """
+
+    def __init__(self, root: str, shard_bytes: int = 256 << 20):
+        os.makedirs(root, exist_ok=True)
+        if os.path.exists(os.path.join(root, META_FILE)):
+            raise FileExistsError(f"Dataset already exists: {root}")
+        self.root = root
+        self.shard_bytes = shard_bytes
+        self.shards = []
+        self.shape = None
+        self.dtype = None
+        self._raw = None
+        self._file = None
+        self._index = []
+        self._offset = 0
+
+    def _open_shard(self):
+        name = f"shard_{len(self.shards):05d}"
+        self._file = open(os.path.join(self.root, name + ".bin"), "wb")
+        self._index = []
+        self._offset = 0
+        self.shards.append({"data": name + ".bin", "index": name + ".idx.npy", "count": 0})
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        index = np.array(self._index, dtype=INDEX_DTYPE)
+        np.save(os.path.join(self.root, self.shards[-1]["index"]), index)
+        self.shards[-1]["count"] = len(index)
+        logging.debug(f"Shard {self.shards[-1]['data']}: {len(index)} samples.")
+
+    def write(self, sample: bytes | np.ndarray, label: int = -1):
+        """
+        Append one sample.
+
+        :param sample: Encoded bytes, or an array; all samples of a dataset
+            must be of the same kind, arrays of the same shape and dtype
+        :param label: Integer label
+        """
+        raw = not isinstance(sample, np.ndarray)
+        if self._raw is None:
+            self._raw = raw
+            if not raw:
+                self.shape, self.dtype = list(sample.shape), sample.dtype.str
+        if raw != self._raw:
+            raise TypeError("Cannot mix bytes and array samples in one dataset.")
+        if not raw:
+            if list(sample.shape) != self.shape or sample.dtype.str != self.dtype:
+                raise ValueError(
+                    f"Sample {sample.shape}/{sample.dtype} does not match "
+                    f"{self.shape}/{self.dtype}."
+                )
+            sample = np.ascontiguousarray(sample).tobytes()
+
+        if self._file is None or self._offset >= self.shard_bytes:
+            self._close_shard()
+            self._open_shard()
+        self._file.write(sample)
+        self._index.append((self._offset, len(sample), label))
+        self._offset += len(sample)
+
+    def close(self):
+        """Flush the last shard and write ``meta.json``."""
+        self._close_shard()
+        meta = {
+            "version": 1,
+            "total": sum(s["count"] for s in self.shards),
+            "shape": self.shape,
+            "dtype": self.dtype,
+            "shards": self.shards,
+        }
+        with open(os.path.join(self.root, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        logging.info(f"Wrote {meta['total']} samples in {len(self.shards)} shards to {self.root}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # leave no meta.json, so a partial dataset is never read as complete
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            logging.error(f"ShardWriter aborted, {self.root} is incomplete")
+
+
+def pack_image_folder(
+    src: str,
+    dst: str,
+    loader: Callable | None = None,
+    exts=(".jpg", ".jpeg", ".png", ".bmp"),
+    **kwargs,
+) -> list:
+    """
+    Pack an ``src/<class>/<image>`` folder into a sharded dataset.
+
+    :param loader: ``path -> bytes | np.ndarray``, defaults to the file bytes.
+        Decoding here (e.g. ``cv2.imread``) trades disk space for no decode
+        at training time
+    :param kwargs: Passed to ``ShardWriter``
+    :return: Class names, index = label
+    """
+    classes = sorted(d for d in os.listdir(src) if os.path.isdir(os.path.join(src, d)))
+    with ShardWriter(dst, **kwargs) as w:
+        for label, cls in enumerate(classes):
+            cdir = os.path.join(src, cls)
+            for fname in sorted(os.listdir(cdir)):
+                if not fname.lower().endswith(exts):
+                    continue
+                path = os.path.join(cdir, fname)
+                if loader is None:
+                    with open(path, "rb") as f:
+                        w.write(f.read(), label)
+                else:
+                    w.write(loader(path), label)
+    return classes
+
+
+class ShardedDataset(Dataset):
+    """
+    Random access reader of a sharded dataset.
+
+    Shards are memory-mapped lazily in each process, so DataLoader workers
+    share the OS page cache instead of copying data; the pickled dataset only
+    carries paths and small metadata.
+    """
+
+    def __init__(self, root: str, decode: Callable | None = None, transform: Callable | None = None):
+        """
+        :param root: Dataset folder written by ``ShardWriter``
+        :param decode: ``np.ndarray[uint8] -> sample`` for bytes datasets,
+            e.g. ``lambda b: cv2.imdecode(b, cv2.IMREAD_COLOR)``
+        :param transform: Applied to the decoded sample
+        """
+        self.root = root
+        with open(os.path.join(root, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.decode = decode
+        self.transform = transform
+        self.shape = self.meta["shape"]
+        self.dtype = np.dtype(self.meta["dtype"]) if self.meta["dtype"] else None
+        counts = np.array([s["count"] for s in self.meta["shards"]], dtype=np.int64)
+        self.counts = counts
+        self.starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        self._data = {}
+        self._index = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # mmaps are reopened in the worker, never pickled
+        state["_data"] = {}
+        state["_index"] = {}
+        return state
+
+    def __len__(self):
+        return int(self.meta["total"])
+
+    def _shard(self, s: int):
+        if s not in self._data:
+            info = self.meta["shards"][s]
+            self._data[s] = np.memmap(
+                os.path.join(self.root, info["data"]), dtype=np.uint8, mode="r"
+            )
+            self._index[s] = np.load(os.path.join(self.root, info["index"]), mmap_mode="r")
+        return self._data[s], self._index[s]
+
+    def locate(self, idx: int) -> tuple:
+        """Global index -> (shard, index in shard)."""
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Index {idx} out of range")
+        s = int(np.searchsorted(self.starts, idx, side="right")) - 1
+        return s, idx - int(self.starts[s])
+
+    def __getitem__(self, idx: int):
+        s, i = self.locate(idx)
+        data, index = self._shard(s)
+        off, length, label = index[i]
+        buf = data[int(off) : int(off) + int(length)]
+        if self.dtype is not None:
+            # copy once out of the read-only page cache
+            sample = np.array(buf.view(self.dtype).reshape(self.shape))
+        elif self.decode is not None:
+            sample = self.decode(buf)
+        else:
+            sample = bytes(buf)
+        if self.transform is not None:
+            sample = self.transform(sample)
+        return sample, int(label)
+
+
+class ShardShuffleSampler(Sampler):
+    """
+    Cache-friendly shuffling: shards are shuffled, then taken ``group`` at a
+    time and the samples inside a group are shuffled together. Only ``group``
+    shards are hot in the page cache at any moment.
+    """
+
+    def __init__(self, dataset: ShardedDataset, group: int = 4, seed: int | None = None):
+        self.counts = dataset.counts
+        self.starts = dataset.starts
+        self.group = max(1, group)
+        self.seed = get_random_seed() if seed is None else seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int):
+        """Reshuffle differently for each epoch, like ``DistributedSampler``."""
+        self.epoch = epoch
+
+    def __len__(self):
+        return int(self.counts.sum())
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        order = rng.permutation(len(self.counts))
+        for g in range(0, len(order), self.group):
+            idx = np.concatenate(
+                [
+                    np.arange(self.starts[s], self.starts[s] + self.counts[s])
+                    for s in order[g : g + self.group]
+                ]
+            )
+            rng.shuffle(idx)
+            yield from idx.tolist()
@@ -0,0 +1,12 @@
+from .model import Model
+
+__all__ = ["Model", "optimize_for_inference"]
+
+
+def __getattr__(name):
+    # torch-backed helpers are imported on first access only
+    if name == "optimize_for_inference":
+        from .optimize import optimize_for_inference
+
+        return optimize_for_inference
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nlxpy.dl.model.bench
+========
+
+Desc: CPU inference benchmark and profiling harness over registered models.
+
+Each model needs an ``input_spec`` (sample shape without batch dim) in its
+registry metadata, and optionally ``default_cfg`` for its constructor::
+
+    Model.register_lazy("Foo", "pkg.mod:Foo", input_spec=[3, 32, 32],
+                        default_cfg={"in_channels": 3})
+
+Usage::
+
+    python -m nlxpy.dl.model.bench -m MLP -b 1 8 32 -t 1 4 --quantize -o res.csv
+
+Author: Neolux Lee
+
+Date: 2025-07-05
+
+Email: neolux_lee@outlook.com
+
+Ver: 0.0.1
+"""
+import os
+import csv
+import copy
+import json
+import time
+import logging
+import argparse
+import itertools
+import multiprocessing
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import torch
+import torch.nn as nn
+
+from .model import Model
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MB."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return rss / (1024 * 1024) if os.uname().sysname == "Darwin" else rss / 1024
+
+
+def current_rss_mb() -> float | None:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def percentile(data: List[float], q: float) -> float:
+    """Linear-interpolated percentile of ``data``, ``q`` in [0, 100]."""
+    data = sorted(data)
+    k = (len(data) - 1) * q / 100
+    f = int(k)
+    c = min(f + 1, len(data) - 1)
+    return data[f] + (data[c] - data[f]) * (k - f)
+
+
+def _prepare(model: nn.Module, mode, channels_last, compile, quantize, ndim):
+    model = copy.deepcopy(model)
+    model.train(mode == "train")
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {nn.Linear}, dtype=torch.qint8
+        )
+    if channels_last and ndim == 4:
+        model = model.to(memory_format=torch.channels_last)
+    if compile:
+        model = torch.compile(model)
+    return model
+
+
+def _profile_ops(model, x, ctx, iters: int, top: int) -> list:
+    from torch.profiler import profile, ProfilerActivity
+
+    with profile(activities=[ProfilerActivity.CPU]) as prof:
+        with ctx():
+            for _ in range(iters):
+                model(x)
+    ret = []
+    events = sorted(
+        prof.key_averages(), key=lambda e: e.self_cpu_time_total, reverse=True
+    )
+    for e in events[:top]:
+        ret.append(
+            {
+                "op": e.key,
+                "calls": e.count,
+                "self_cpu_ms": e.self_cpu_time_total / 1000,
+                "cpu_total_ms": e.cpu_time_total / 1000,
+            }
+        )
+    return ret
+
+
+def _has_quantizable(model: nn.Module) -> bool:
+    return any(isinstance(m, nn.Linear) for m in model.modules())
+
+
+def _measure(base, name, shape, setting, warmup, iters, profile, profile_top) -> dict:
+    """Run one setting in this process."""
+    bs, nt, mode, im, cl, comp, quant = setting
+    old_threads = torch.get_num_threads()
+    rss_before = current_rss_mb()
+    try:
+        torch.set_num_threads(nt)
+        x = torch.randn(bs, *shape)
+        if cl:
+            x = x.contiguous(memory_format=torch.channels_last)
+        model = _prepare(base, mode, cl, comp, quant, x.dim())
+        ctx = torch.inference_mode if im else contextlib.nullcontext
+
+        with ctx():
+            for _ in range(warmup):
+                model(x)
+            lat = []
+            for _ in range(iters):
+                t0 = time.perf_counter()
+                model(x)
+                lat.append((time.perf_counter() - t0) * 1000)
+        rss_after = current_rss_mb()
+
+        res = {
+            "model": name,
+            "batch_size": bs,
+            "threads": torch.get_num_threads(),
+            "mode": mode,
+            "inference_mode": im,
+            "channels_last": cl,
+            "compile": comp,
+            "quantize": quant,
+            "p50_ms": percentile(lat, 50),
+            "p90_ms": percentile(lat, 90),
+            "p99_ms": percentile(lat, 99),
+            "mean_ms": sum(lat) / len(lat),
+            "throughput": bs * 1000 * len(lat) / sum(lat),
+            "rss_mb": rss_after,
+            "rss_delta_mb": (
+                rss_after - rss_before if None not in (rss_before, rss_after) else None
+            ),
+            # peak of the whole process so far, per setting only when isolated
+            "peak_rss_mb": peak_rss_mb(),
+            "peak_rss_scope": "process",
+        }
+        if profile:
+            res["ops"] = _profile_ops(model, x, ctx, min(iters, 10), profile_top)
+    finally:
+        torch.set_num_threads(old_threads)
+    return res
+
+
+def _measure_isolated(*args) -> dict:
+    """Run one setting in a fresh process, where ``ru_maxrss`` is its own peak."""
+    res = _measure(*args)
+    res["peak_rss_scope"] = "setting"
+    return res
+
+
+def benchmark_model(
+    name: str,
+    batch_sizes=(1, 8, 32),
+    threads=(None,),
+    modes=("eval",),
+    inference_mode=(True,),
+    channels_last=(False,),
+    compile=(False,),
+    quantize=(False,),
+    warmup: int = 5,
+    iters: int = 50,
+    profile: bool = False,
+    profile_top: int = 10,
+    isolate: bool = False,
+    **cfg,
+) -> list:
+    """
+    Sweep inference settings for one registered model.
+
+    Every argument given as a tuple is swept, invalid combinations (training
+    mode with ``inference_mode`` or quantization, channels_last on non-image
+    input, quantization of a model without ``nn.Linear``) are skipped.
+    ``None`` in ``threads`` keeps the current ``torch.get_num_threads()``.
+
+    Memory is reported per setting as the current RSS after it (``rss_mb``),
+    its growth (``rss_delta_mb``) and the peak RSS (``peak_rss_mb``). The peak
+    is process-wide, i.e. the maximum over all settings run so far
+    (``peak_rss_scope`` is ``"process"``); with ``isolate`` every setting runs
+    in its own spawned process and the peak is its own (``"setting"``).
+
+    :param name: Registry name, needs ``input_spec`` in its metadata
+    :param isolate: Run each setting in a subprocess, slower but separated
+    :param cfg: Constructor kwargs, override ``default_cfg`` of the model
+    :return: One result dict per setting
+    """
+    info = Model.info(name)
+    if "input_spec" not in info:
+        raise ValueError(f"Model '{name}' declares no 'input_spec'.")
+    shape = list(info["input_spec"])
+    base = Model.build(name, **{**info.get("default_cfg", {}), **cfg})
+    quantizable = _has_quantizable(base)
+    if any(quantize) and not quantizable:
+        logging.warning(f"Skip int8 runs of '{name}': no nn.Linear to quantize.")
+
+    results = []
+    default_threads = torch.get_num_threads()
+    for bs, nt, mode, im, cl, comp, quant in itertools.product(
+        batch_sizes, threads, modes, inference_mode, channels_last, compile, quantize
+    ):
+        if mode == "train" and (im or quant):
+            continue
+        if cl and len(shape) != 3:
+            continue
+        if quant and not quantizable:
+            continue
+        setting = (bs, nt if nt else default_threads, mode, im, cl, comp, quant)
+        args = (base, name, shape, setting, warmup, iters, profile, profile_top)
+        if isolate:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+                res = ex.submit(_measure_isolated, *args).result()
+        else:
+            res = _measure(*args)
+        logging.info(
+            f"{name} bs={bs} th={res['threads']} {mode} im={im} cl={cl} "
+            f"compile={comp} int8={quant}: p50 {res['p50_ms']:.3f} ms, "
+            f"{res['throughput']:.1f} samples/s"
+        )
+        results.append(res)
+    return results
+
+
+def benchmark_registry(names: List[str] | None = None, **kwargs) -> list:
+    """
+    Benchmark registered models, those without ``input_spec`` are skipped.
+
+    :param names: Registry names, all registered models if None
+    :param kwargs: Passed to ``benchmark_model``
+    """
+    if names is None:
+        names = [m["name"] for m in Model.get_registered_models(proc=True)]
+    results = []
+    for name in names:
+        if "input_spec" not in Model.info(name):
+            logging.warning(f"Skip '{name}': no 'input_spec' declared.")
+            continue
+        results.extend(benchmark_model(name, **kwargs))
+    return results
+
+
+def save_results(results: list, path: str):
+    """Save results as JSON, or CSV (op breakdowns flattened to a JSON column)."""
+    if path.endswith(".json"):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        return
+    keys = []
+    for r in results:
+        keys.extend(k for k in r if k not in keys)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=keys)
+        writer.writeheader()
+        for r in results:
+            row = dict(r)
+            if "ops" in row:
+                row["ops"] = json.dumps(row["ops"])
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark registered models on CPU")
+    parser.add_argument("-m", "--models", nargs="*", default=None)
+    parser.add_argument("-b", "--batch-sizes", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("-t", "--threads", nargs="+", type=int, default=[None])
+    parser.add_argument("--train", action="store_true", help="also run train mode")
+    parser.add_argument("--no-inference-mode", action="store_true", help="also run without inference_mode")
+    parser.add_argument("--channels-last", action="store_true", help="also run channels_last")
+    parser.add_argument("--compile", action="store_true", help="also run torch.compile")
+    parser.add_argument("--quantize", action="store_true", help="also run dynamic int8")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--iters", type=int, default=50)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--isolate", action="store_true", help="one subprocess per setting, so peak RSS is per setting instead of process-wide")
+    parser.add_argument("-o", "--output", default="bench.json", help=".json or .csv")
+    args = parser.parse_args()
+
+    results = benchmark_registry(
+        args.models,
+        batch_sizes=args.batch_sizes,
+        threads=args.threads,
+        modes=("eval", "train") if args.train else ("eval",),
+        inference_mode=(True, False) if args.no_inference_mode else (True,),
+        channels_last=(False, True) if args.channels_last else (False,),
+        compile=(False, True) if args.compile else (False,),
+        quantize=(False, True) if args.quantize else (False,),
+        warmup=args.warmup,
+        iters=args.iters,
+        profile=args.profile,
+        isolate=args.isolate,
+    )
+    save_results(results, args.output)
+    print(f"Saved {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nlxpy.dl.model.builder
+========
+
+Desc: Build networks from YAML/TOML configs out of registered blocks.
+
+Config layout::
+
+    model:
+      name: LeNet
+      input_shape: [1, 28, 28]    # needed by ``auto`` arguments
+    nc: 10                        # top-level scalars are variables
+    options:                      # optional, same as from_config kwargs
+      channels_last: false
+    blocks:
+      - block: Conv2dBlock        # registry name, omit for a pure merge
+        name: conv
+        from: -1                  # int (relative if < 0), name, or a list
+        merge: cat                # cat | add, when ``from`` is a list
+        args: {in_channels: auto} # constructor kwargs
+
+``auto`` resolves to dim 1 (channels/features) of the block input, found by
+a dummy forward pass. The resolved blocks (arguments after probing) are
+memoized by config hash. Every build constructs fresh blocks from them in the
+same order, so the weights only depend on the RNG state, cached or not, and
+any initialisation a block does in its ``__init__`` is kept.
+
+Author: Neolux Lee
+
+Date: 2025-07-02
+
+Email: neolux_lee@outlook.com
+
+Ver: 0.0.1
+"""
+import os
+import copy
+import json
+import hashlib
+import logging
+from typing import List
+
+import torch
+import torch.nn as nn
+
+from .model import Model
+
+ZOO_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "data",
+    "dl",
+    "model_zoo",
+)
+
+_RESERVED_KEYS = ("model", "blocks", "options")
+
+_parse_cache: dict = {}
+_build_cache: dict = {}
+
+
+def load_config(path_or_dict: str | dict) -> dict:
+    """
+    Load a model config from a dict, a YAML/TOML file or a model zoo name.
+
+    Parsed files are cached by (path, mtime).
+    """
+    if isinstance(path_or_dict, dict):
+        return path_or_dict
+    path = str(path_or_dict)
+    if not os.path.exists(path):
+        for ext in (".yaml", ".yml", ".toml"):
+            zoo_path = os.path.join(ZOO_DIR, path + ext)
+            if os.path.exists(zoo_path):
+                path = zoo_path
+                break
+        else:
+            raise FileNotFoundError(f"Model config not found: {path_or_dict}")
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    if key in _parse_cache:
+        return _parse_cache[key]
+    if path.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(path, "rb") as f:
+            cfg = tomllib.load(f)
+    else:
+        import yaml
+
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = yaml.safe_load(f)
+    _parse_cache[key] = cfg
+    return cfg
+
+
+def config_hash(cfg: dict, **options) -> str:
+    """Stable hash of a config and the build options."""
+    blob = json.dumps({"cfg": cfg, "options": options}, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+class ConfigNet(nn.Module):
+    """
+    Network assembled from a config, supports graph-style skip connections.
+
+    Layer ``i`` reads the outputs listed in ``froms[i]`` (``-1`` is the network
+    input) merged by ``merges[i]``.
+    """
+
+    def __init__(
+        self,
+        layers: List[nn.Module],
+        names: List[str],
+        froms: List[List[int]],
+        merges: List[str],
+    ):
+        super(ConfigNet, self).__init__()
+        self.layers = nn.ModuleList(layers)
+        self.names = names
+        self.froms = froms
+        self.merges = merges
+        # Only keep the outputs somebody reads later, plus the last one
+        keep = {len(layers) - 1}
+        for i, src in enumerate(froms):
+            for j in src:
+                if j != i - 1:
+                    keep.add(j)
+        self.keep = [i in keep for i in range(len(layers))]
+
+    def forward(self, x):
+        """
+        Forward pass through the config graph.
+        :param x: Input tensor.
+        :return: Output of the last block.
+        """
+        outs: List[torch.Tensor] = []
+        prev = x
+        for i, layer in enumerate(self.layers):
+            src = self.froms[i]
+            inputs: List[torch.Tensor] = []
+            for j in src:
+                if j == i - 1:
+                    inputs.append(prev)
+                elif j < 0:
+                    inputs.append(x)
+                else:
+                    inputs.append(outs[j])
+            if len(inputs) == 1:
+                h = inputs[0]
+            elif self.merges[i] == "add":
+                h = inputs[0]
+                for t in inputs[1:]:
+                    h = h + t
+            else:
+                h = torch.cat(inputs, dim=1)
+            prev = layer(h)
+            outs.append(prev if self.keep[i] else x)
+        return prev
+
+
+def _resolve_args(value, variables: dict, auto):
+    """Substitute variables and ``auto`` in block arguments."""
+    if isinstance(value, dict):
+        return {k: _resolve_args(v, variables, auto) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_resolve_args(v, variables, auto) for v in value]
+    if isinstance(value, str):
+        if value == "auto":
+            if auto is None:
+                raise ValueError(
+                    "'auto' argument needs 'model.input_shape' in the config."
+                )
+            return auto
+        if value in variables:
+            return variables[value]
+    return value
+
+
+def _resolve_from(src, idx: int, names: dict) -> List[int]:
+    """Turn a ``from`` spec into absolute indices, ``-1`` is the net input."""
+    if src is None:
+        src = -1
+    if not isinstance(src, (list, tuple)):
+        src = [src]
+    ret = []
+    for s in src:
+        if isinstance(s, str):
+            if s not in names:
+                raise ValueError(f"Block {idx}: unknown input block '{s}'.")
+            ret.append(names[s])
+        elif s < 0:
+            if idx + s < -1:
+                raise ValueError(f"Block {idx}: input {s} reaches before the network input.")
+            ret.append(idx + s)
+        else:
+            if s >= idx:
+                raise ValueError(f"Block {idx}: input {s} is not an earlier block.")
+            ret.append(s)
+    return ret
+
+
+def _assemble(cfg: dict) -> tuple:
+    """Build a net by probing the config, also return its resolved plan."""
+    variables = {k: v for k, v in cfg.items() if k not in _RESERVED_KEYS}
+    input_shape = (cfg.get("model") or {}).get("input_shape")
+    probe = None
+    probes: List[torch.Tensor] = []
+    if input_shape is not None:
+        # batch of 2 in eval mode so BatchNorm and friends accept the dummy
+        probe = torch.zeros(2, *input_shape)
+
+    layers, names, froms, merges = [], [], [], []
+    specs = []
+    name_idx: dict = {}
+    for idx, bcfg in enumerate(cfg.get("blocks") or []):
+        src = _resolve_from(bcfg.get("from"), idx, name_idx)
+        merge = bcfg.get("merge", "cat")
+        if merge not in ("cat", "add"):
+            raise ValueError(f"Block {idx}: unsupported merge '{merge}'.")
+
+        h = None
+        if probe is not None:
+            ins = [probe if j < 0 else probes[j] for j in src]
+            if len(ins) == 1:
+                h = ins[0]
+            elif merge == "add":
+                h = torch.stack(ins).sum(0)
+            else:
+                h = torch.cat(ins, dim=1)
+
+        args = _resolve_args(
+            bcfg.get("args") or {}, variables, None if h is None else h.shape[1]
+        )
+        block = bcfg.get("block")
+        specs.append((block, copy.deepcopy(args)))
+        layer = Model.build(block, **args) if block else nn.Identity()
+        if h is not None:
+            layer.eval()
+            # probing must not move the RNG, or cached builds would differ
+            with torch.no_grad(), torch.random.fork_rng(devices=[]):
+                probes.append(layer(h))
+            layer.train()
+
+        name = bcfg.get("name", f"{block or 'merge'}_{idx}")
+        if name in name_idx:
+            raise ValueError(f"Block {idx}: duplicate block name '{name}'.")
+        name_idx[name] = idx
+        layers.append(layer)
+        names.append(name)
+        froms.append(src)
+        merges.append(merge)
+        logging.debug(f"Block {idx} '{name}': {block} from {src}.")
+
+    if not layers:
+        raise ValueError("Model config has no blocks.")
+    plan = (specs, list(names), [list(f) for f in froms], list(merges))
+    return ConfigNet(layers, names, froms, merges), plan
+
+
+def _instantiate(plan: tuple) -> ConfigNet:
+    """Build a net from a resolved plan, no probing."""
+    specs, names, froms, merges = plan
+    layers = [
+        Model.build(block, **copy.deepcopy(args)) if block else nn.Identity()
+        for block, args in specs
+    ]
+    return ConfigNet(layers, list(names), [list(f) for f in froms], list(merges))
+
+
+def _finalize(net: nn.Module, channels_last=False, script=False, compile=False):
+    if channels_last:
+        net = net.to(memory_format=torch.channels_last)
+    if script:
+        net = torch.jit.script(net)
+    if compile:
+        kwargs = compile if isinstance(compile, dict) else {}
+        net = torch.compile(net, **kwargs)
+    return net
+
+
+def build_from_config(
+    path_or_dict: str | dict,
+    cache: bool = True,
+    channels_last: bool | None = None,
+    script: bool | None = None,
+    compile: bool | dict | None = None,
+) -> nn.Module:
+    """
+    Build a network from a config.
+
+    :param path_or_dict: Config dict, YAML/TOML path or model zoo name
+    :param cache: Reuse the blocks resolved for the same config hash instead
+        of probing the config again; the blocks are still constructed anew
+    :param channels_last: Convert to ``torch.channels_last`` memory format
+    :param script: Apply ``torch.jit.script``
+    :param compile: Apply ``torch.compile``, a dict is passed as its kwargs
+    :return: The built module
+    """
+    cfg = load_config(path_or_dict)
+    options = dict(cfg.get("options") or {})
+    for k, v in (
+        ("channels_last", channels_last),
+        ("script", script),
+        ("compile", compile),
+    ):
+        if v is not None:
+            options[k] = v
+
+    # the cache holds the resolved blocks, the options are applied per build
+    key = config_hash(cfg)
+    if cache and key in _build_cache:
+        logging.debug(f"Model config {key[:8]} hit build cache.")
+        net = _instantiate(_build_cache[key])
+    else:
+        net, plan = _assemble(cfg)
+        if cache:
+            _build_cache[key] = plan
+    return _finalize(net, **options)
+
+
+def clear_cache():
+    """Drop parsed configs and resolved blocks."""
+    _parse_cache.clear()
+    _build_cache.clear()
@@ -6,42 +6,113 @@ nlxpy.dl.model.model
 
 Desc: Model factory and register for deep learning models.
 
+Entries are stored lazily as ``"pkg.mod:Class"`` strings, so listing or
+resolving models never imports ``torch``; the class is only imported on the
+first ``Model.build``/``Model.get``. Third-party models can be discovered
+through the ``nlxpy.models`` entry-point group.
+
 Author: Neolux Lee
 
 Date: 2025-06-13
 
 Email: neolux_lee@outlook.com
 
-Ver: 0.0.1
+Ver: 0.0.2
 """
 import os
 from typing import Callable
+import importlib
 import logging
 
+ENTRY_POINT_GROUP = "nlxpy.models"
+
+
+def _target_of(mcls) -> str:
+    """Return the ``"pkg.mod:Class"`` import path of a class."""
+    return f"{mcls.__module__}:{mcls.__qualname__}"
+
+
+def _import_target(target: str):
+    """Import a ``"pkg.mod:Class"`` string and return the object."""
+    modname, _, attr = target.partition(":")
+    if not modname or not attr:
+        raise ValueError(f"Invalid model target '{target}', expect 'pkg.mod:Class'.")
+    obj = importlib.import_module(modname)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
 
 class Model:
     """
     Model registration and management class.
+
+    Every registry entry is a dict with keys:
+        target: the registered class, or a ``"pkg.mod:Class"`` string not imported yet
+        note: short description
+        meta: free-form metadata (e.g. ``input_spec``), never requires an import
     """
 
     __module_registry: dict = {}
+    __discovered: bool = False
 
     def __init__(self, *args, **kwargs):
         pass
 
     @classmethod
-    def register(cls, name: str, note: str | None = None) -> Callable:
-        """Register the model with a given name."""
+    def register(
+        cls, name: str, note: str | None = None, **meta
+    ) -> Callable:
+        """Register the model with a given name, returns the decorated class."""
 
         def register_model(mcls):
-            if name in cls.__module_registry:
-                raise ValueError(f"Model '{name}' is already registered.")
-            cls.__module_registry[name] = (mcls, note if note else mcls.__name__)
+            entry = cls.__module_registry.get(name)
+            if entry is not None:
+                # A lazy entry pointing at this very class is resolved in place,
+                # anything else is a name clash.
+                target = entry["target"]
+                if not isinstance(target, str):
+                    target = _target_of(target)
+                if target != _target_of(mcls):
+                    raise ValueError(f"Model '{name}' is already registered.")
+                entry["target"] = mcls
+                entry["meta"].update(meta)
+                if note:
+                    entry["note"] = note
+            else:
+                cls.__module_registry[name] = {
+                    "target": mcls,
+                    "note": note if note else mcls.__name__,
+                    "meta": dict(meta),
+                }
             logging.debug(f"Model '{name}' registered successfully.")
-            return cls
+            return mcls
 
         return register_model
 
+    @classmethod
+    def register_lazy(
+        cls, name: str, target: str, note: str | None = None, **meta
+    ) -> None:
+        """
+        Register a model by its import path without importing it.
+
+        :param name: Registry name
+        :param target: Import path, ``"pkg.mod:Class"``
+        :param note: Short description, defaults to the class name
+        :param meta: Extra metadata kept with the entry
+        """
+        if name in cls.__module_registry:
+            raise ValueError(f"Model '{name}' is already registered.")
+        if ":" not in target:
+            raise ValueError(f"Invalid model target '{target}', expect 'pkg.mod:Class'.")
+        cls.__module_registry[name] = {
+            "target": target,
+            "note": note if note else target.rpartition(":")[2],
+            "meta": dict(meta),
+        }
+        logging.debug(f"Model '{name}' registered lazily -> {target}.")
+
     @classmethod
     def unregister(cls, name: str) -> bool:
         """Unregister the model with a given name."""
@@ -53,6 +124,87 @@ class Model:
             logging.warning(f"Model '{name}' not found in registry.")
             return False
 
+    @classmethod
+    def discover(cls, force: bool = False) -> int:
+        """
+        Register third-party models advertised in the ``nlxpy.models``
+        entry-point group. Only the metadata is read, nothing is imported.
+
+        :param force: Scan again even if already done
+        :return: Number of newly registered models
+        """
+        if cls.__discovered and not force:
+            return 0
+        cls.__discovered = True
+        from importlib.metadata import entry_points
+
+        count = 0
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            if ep.name in cls.__module_registry:
+                logging.debug(f"Entry point '{ep.name}' shadowed by a registered model.")
+                continue
+            try:
+                cls.register_lazy(ep.name, ep.value, note=f"{ep.value} (entry point)")
+                count += 1
+            except ValueError as e:
+                logging.warning(f"Skip entry point '{ep.name}': {e}")
+        return count
+
+    @classmethod
+    def is_registered(cls, name: str) -> bool:
+        """Check whether a model name is registered, without importing it."""
+        cls.discover()
+        return name in cls.__module_registry
+
+    @classmethod
+    def info(cls, name: str) -> dict:
+        """Get the note and metadata of a model, without importing it."""
+        cls.discover()
+        if name not in cls.__module_registry:
+            raise KeyError(f"Model '{name}' not found in registry.")
+        entry = cls.__module_registry[name]
+        target = entry["target"]
+        return {
+            "name": name,
+            "desc": entry["note"],
+            "target": target if isinstance(target, str) else _target_of(target),
+            "loaded": not isinstance(target, str),
+            **entry["meta"],
+        }
+
+    @classmethod
+    def get(cls, name: str):
+        """Get the class of a model, importing it on first use."""
+        cls.discover()
+        if name not in cls.__module_registry:
+            raise KeyError(f"Model '{name}' not found in registry.")
+        entry = cls.__module_registry[name]
+        if isinstance(entry["target"], str):
+            target = entry["target"]
+            mcls = _import_target(target)
+            # Importing the module may already have resolved the entry via
+            # ``register``; either way the class is cached from now on.
+            entry["target"] = mcls
+            logging.debug(f"Model '{name}' loaded from {target}.")
+        return entry["target"]
+
+    @classmethod
+    def build(cls, name: str, **cfg):
+        """Build a model instance by name, ``cfg`` is passed to its constructor."""
+        return cls.get(name)(**cfg)
+
+    @classmethod
+    def from_config(cls, path_or_dict: str | dict, **kwargs):
+        """
+        Build a network from a YAML/TOML config (or dict) of registered blocks.
+
+        See ``nlxpy.dl.model.builder`` for the config layout and the
+        ``cache``/``channels_last``/``script``/``compile`` options.
+        """
+        from .builder import build_from_config
+
+        return build_from_config(path_or_dict, **kwargs)
+
     @classmethod
     def get_registered_models(cls, proc=False) -> list | None:
         """
@@ -60,23 +212,44 @@ class Model:
 
         :param proc: If True, return a list for following processing. If False, print it out
         """
+        cls.discover()
         if proc:
             ret = []
-            for name, (mcls, note) in cls.__module_registry.items():
-                ret.append({"name": name, "desc": note})
+            for name, entry in cls.__module_registry.items():
+                ret.append({"name": name, "desc": entry["note"]})
             return ret
         else:
             if not cls.__module_registry:
                 print("No models registered.")
             else:
                 print("Registered models:")
-                for idx, (name, (mcls, note)) in enumerate(
-                    cls.__module_registry.items()
-                ):
-                    print(f"{idx + 1}. {name} - {note}")
+                for idx, (name, entry) in enumerate(cls.__module_registry.items()):
+                    print(f"{idx + 1}. {name} - {entry['note']}")
             return None
 
 
+# Built-in blocks, imported from nlxpy.dl.model.module (and torch) on demand.
+# ``input_spec`` is the sample shape without batch dim, used by benchmarks.
+Model.register_lazy(
+    "MLP",
+    "nlxpy.dl.model.module:MLP",
+    note="Multi-Layer Perceptron",
+    input_spec=[784],
+)
+Model.register_lazy(
+    "Conv2dBlock",
+    "nlxpy.dl.model.module:ConvBlock",
+    note="Convolutional Block 2D",
+    input_spec=[3, 32, 32],
+    default_cfg={"in_channels": 3, "out_channels": 64},
+)
+Model.register_lazy(
+    "Flatten",
+    "nlxpy.dl.model.module:Flatten",
+    note="Flatten Layer",
+    input_spec=[3, 32, 32],
+)
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -91,9 +264,9 @@ if __name__ == "__main__":
 
     Model.get_registered_models(proc=False)
 
-    # Access the registered model
-    # model_instance = Model.__MODULE_REGISTRY["example_model"]()
-    # print(f"Registered model: {model_instance.__class__.__name__}")
+    # Build the registered model
+    model_instance = Model.build("example_model")
+    print(f"Built model: {model_instance.__class__.__name__}")
 
     # Unregister the model
     Model.unregister("example_model")
@@ -97,9 +97,8 @@ class Flatten(nn.Module):
     def __init__(self, use_nn=False):
         super(Flatten, self).__init__()
         self.use_nn = use_nn
-        if use_nn:
-            self.flatten = nn.Flatten()
-            
+        # always defined so that torch.jit.script can compile both branches
+        self.flatten = nn.Flatten()
 
     def forward(self, x):
         """
@@ -110,7 +109,8 @@ class Flatten(nn.Module):
         if self.use_nn:
             return self.flatten(x)
         else:
-            return x.view(x.size(0), -1)
+            # reshape copies when needed, e.g. channels_last inputs
+            return x.reshape(x.size(0), -1)
 
 if __name__ == "__main__":
     logging.basicConfig(
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nlxpy.dl.model.optimize
+========
+
+Desc: Inference-time graph optimizations for registered blocks.
+
+Walks every ``nn.Sequential`` of a model (``MLP``, ``ConvBlock``, ...) and
+- folds BatchNorm into the preceding Conv/Linear
+- strips Dropout
+- fuses Conv/Linear + ReLU into ``torch.ao.nn.intrinsic`` modules
+then optionally checks numerical equivalence and exports to ONNX.
+
+Author: Neolux Lee
+
+Date: 2025-07-08
+
+Email: neolux_lee@outlook.com
+
+Ver: 0.0.1
+"""
+import copy
+import logging
+
+import torch
+import torch.nn as nn
+from torch.nn.utils.fusion import fuse_conv_bn_eval
+
+try:
+    from torch.nn.utils.fusion import fuse_linear_bn_eval
+except ImportError:  # torch < 2.1
+    fuse_linear_bn_eval = None
+
+try:
+    import torch.ao.nn.intrinsic as nni
+except ImportError:
+    nni = None
+
+# already fused modules are Sequential subclasses, leave them alone
+_FUSED = getattr(nni, "_FusedModule", ())
+
+class EquivalenceError(ValueError):
+    """The optimized or exported model does not match the original."""
+
+
+_CONV_BN = {nn.Conv1d: nn.BatchNorm1d, nn.Conv2d: nn.BatchNorm2d, nn.Conv3d: nn.BatchNorm3d}
+
+
+def _fuse_relu_cls(layer):
+    if nni is None:
+        return None
+    return {
+        nn.Conv1d: nni.ConvReLU1d,
+        nn.Conv2d: nni.ConvReLU2d,
+        nn.Conv3d: nni.ConvReLU3d,
+        nn.Linear: nni.LinearReLU,
+    }.get(type(layer))
+
+
+def _fold_sequential(seq: nn.Sequential, fuse_relu: bool, stats: dict) -> nn.Sequential:
+    layers = [m for m in seq if not isinstance(m, nn.modules.dropout._DropoutNd)]
+    stats["dropout"] += len(seq) - len(layers)
+
+    folded = []
+    for m in layers:
+        prev = folded[-1] if folded else None
+        if (
+            isinstance(m, nn.modules.batchnorm._BatchNorm)
+            and type(prev) in _CONV_BN
+            and isinstance(m, _CONV_BN[type(prev)])
+        ):
+            folded[-1] = fuse_conv_bn_eval(prev, m)
+            stats["bn"] += 1
+        elif (
+            isinstance(m, nn.BatchNorm1d)
+            and type(prev) is nn.Linear
+            and fuse_linear_bn_eval is not None
+        ):
+            folded[-1] = fuse_linear_bn_eval(prev, m)
+            stats["bn"] += 1
+        elif fuse_relu and type(m) is nn.ReLU and _fuse_relu_cls(prev) is not None:
+            folded[-1] = _fuse_relu_cls(prev)(prev, m)
+            stats["relu"] += 1
+        else:
+            folded.append(m)
+    return nn.Sequential(*folded)
+
+
+def _optimize_children(module: nn.Module, fuse_relu: bool, stats: dict):
+    for name, child in module.named_children():
+        if isinstance(child, _FUSED):
+            continue
+        if isinstance(child, nn.Sequential):
+            _optimize_children(child, fuse_relu, stats)
+            setattr(module, name, _fold_sequential(child, fuse_relu, stats))
+        elif isinstance(child, nn.modules.dropout._DropoutNd):
+            # Sequential members are stripped by _fold_sequential, so that
+            # folding and fusion see through them
+            if not isinstance(module, nn.Sequential):
+                setattr(module, name, nn.Identity())
+                stats["dropout"] += 1
+        else:
+            _optimize_children(child, fuse_relu, stats)
+
+
+@torch.no_grad()
+def check_equivalence(
+    reference: nn.Module,
+    candidate: nn.Module,
+    example_input: torch.Tensor,
+    rtol: float = 1e-4,
+    atol: float = 1e-5,
+) -> float:
+    """
+    Compare two models in eval mode on ``example_input``.
+
+    :return: Max absolute difference of the outputs
+    :raises EquivalenceError: If the outputs are not close
+    """
+    was_training = reference.training
+    reference.eval()
+    try:
+        ref = reference(example_input)
+    finally:
+        reference.train(was_training)
+    out = candidate(example_input)
+    diff = (ref - out).abs().max().item()
+    if not torch.allclose(ref, out, rtol=rtol, atol=atol):
+        raise EquivalenceError(
+            f"Optimized model differs from the original, max abs diff {diff:.3e}"
+        )
+    return diff
+
+
+def export_onnx(
+    model: nn.Module,
+    example_input: torch.Tensor,
+    path: str,
+    opset: int = 17,
+    check: bool = True,
+    atol: float = 1e-5,
+):
+    """
+    Export a model to ONNX with a dynamic batch dim, and check the output
+    with onnxruntime if it is installed.
+    """
+    torch.onnx.export(
+        model,
+        (example_input,),
+        path,
+        input_names=["input"],
+        output_names=["output"],
+        dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+        opset_version=opset,
+    )
+    logging.info(f"Exported ONNX model to {path}")
+    if not check:
+        return
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        logging.warning("onnxruntime not installed, skip ONNX output check.")
+        return
+    sess = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+    out = sess.run(None, {"input": example_input.numpy()})[0]
+    with torch.no_grad():
+        ref = model(example_input).numpy()
+    diff = abs(out - ref).max()
+    if diff > atol * 10:
+        raise EquivalenceError(f"ONNX output differs, max abs diff {diff:.3e}")
+
+
+def optimize_for_inference(
+    model: nn.Module,
+    example_input: torch.Tensor | None = None,
+    fuse_relu: bool = True,
+    inplace: bool = False,
+    rtol: float = 1e-4,
+    atol: float = 1e-5,
+    onnx_path: str | None = None,
+) -> nn.Module:
+    """
+    Fold BN, strip Dropout and fuse ReLU for eval-mode deployment.
+
+    :param model: Model to optimize, e.g. from ``Model.build``/``Model.from_config``
+    :param example_input: If given, the result is checked against the original
+    :param fuse_relu: Fuse Conv/Linear + ReLU into ``torch.ao.nn.intrinsic``
+        modules, which quantization and TorchScript freezing pick up
+    :param inplace: Modify ``model`` instead of a copy
+    :param onnx_path: Export the optimized model to ONNX, needs ``example_input``
+    :return: The optimized model, in eval mode
+    """
+    # with inplace the original is gone afterwards, keep a copy to check against
+    reference = copy.deepcopy(model) if inplace and example_input is not None else model
+    opt = model if inplace else copy.deepcopy(model)
+    opt.eval()
+    stats = {"bn": 0, "dropout": 0, "relu": 0}
+    _optimize_children(opt, fuse_relu, stats)
+    if isinstance(opt, nn.Sequential):
+        opt = _fold_sequential(opt, fuse_relu, stats)
+    opt.eval()
+    logging.info(
+        f"Folded {stats['bn']} BatchNorm, removed {stats['dropout']} Dropout, "
+        f"fused {stats['relu']} ReLU."
+    )
+
+    if example_input is not None:
+        diff = check_equivalence(reference, opt, example_input, rtol=rtol, atol=atol)
+        logging.info(f"Equivalence check passed, max abs diff {diff:.3e}")
+    if onnx_path:
+        if example_input is None:
+            raise ValueError("'onnx_path' needs 'example_input'.")
+        export_onnx(opt, example_input, onnx_path, atol=atol)
+    return opt
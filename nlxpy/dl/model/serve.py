@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+nlxpy.dl.model.serve
+========
+
+Desc: Dynamic micro-batching CPU inference engine for registered models.
+
+Requests are queued, grouped into batches by a max-size / max-wait policy and
+run by one worker thread with a pinned ``torch`` thread count; results are
+scattered back through futures. ``InferenceServer`` is an optional localhost
+TCP front end speaking newline-delimited JSON.
+
+Usage::
+
+    engine = InferenceEngine("MLP", {"input_size": 784}, max_batch_size=32)
+    out = engine.infer(torch.randn(784))           # blocking
+    out = await engine.infer_async(torch.randn(784))
+    engine.close()
+
+Author: Neolux Lee
+
+Date: 2025-07-10
+
+Email: neolux_lee@outlook.com
+
+Ver: 0.0.1
+"""
+import json
+import time
+import queue
+import socket
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+import torch
+
+from .model import Model
+
+
+class _Request:
+    __slots__ = ("x", "future", "t_enqueue")
+
+    def __init__(self, x, future):
+        self.x = x
+        self.future = future
+        self.t_enqueue = time.perf_counter()
+
+
+class InferenceEngine:
+    """
+    In-process inference engine with dynamic micro-batching.
+
+    Each request is one sample (no batch dim), samples of a batch must share
+    their shape.
+    """
+
+    def __init__(
+        self,
+        name: str | None = None,
+        cfg: dict | None = None,
+        model: torch.nn.Module | None = None,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        num_threads: int | None = None,
+        max_queue: int = 0,
+    ):
+        """
+        :param name: Registry name of the model
+        :param cfg: Constructor kwargs for ``Model.build``
+        :param model: Prebuilt model, overrides ``name``/``cfg``
+        :param max_batch_size: Upper bound of a batch
+        :param max_wait_ms: Longest time the first request of a batch waits
+        :param num_threads: ``torch.set_num_threads`` for the worker
+        :param max_queue: Queue bound, 0 for unbounded
+        """
+        if model is None:
+            if name is None:
+                raise ValueError("Either 'name' or 'model' is required.")
+            model = Model.build(name, **(cfg or {}))
+        self.model = model.eval()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.num_threads = num_threads
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._running = True
+        self._lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._stats = self._empty_stats()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _empty_stats():
+        return {
+            "requests": 0,
+            "batches": 0,
+            "queue_wait_ms": 0.0,
+            "service_ms": 0.0,
+            "max_batch": 0,
+        }
+
+    def submit(self, x: torch.Tensor) -> Future:
+        """Queue one sample, returns a future of its output."""
+        fut = Future()
+        # checked and put under the lock, so nothing is queued after close()
+        with self._submit_lock:
+            if not self._running:
+                raise RuntimeError("InferenceEngine is closed")
+            self._queue.put(_Request(x, fut))
+        return fut
+
+    def infer(self, x: torch.Tensor, timeout: float | None = None) -> torch.Tensor:
+        """Blocking inference of one sample."""
+        return self.submit(x).result(timeout)
+
+    async def infer_async(self, x: torch.Tensor) -> torch.Tensor:
+        """Awaitable inference of one sample."""
+        return await asyncio.wrap_future(self.submit(x))
+
+    def _get(self, timeout: float | None):
+        """Next request whose caller has not cancelled it, or None."""
+        end = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            remain = None if end is None else end - time.perf_counter()
+            try:
+                if remain is not None and remain <= 0:
+                    req = self._queue.get_nowait()
+                else:
+                    req = self._queue.get(timeout=remain)
+            except queue.Empty:
+                return None
+            # False means cancelled (e.g. asyncio.wait_for timed out): drop it
+            if req.future.set_running_or_notify_cancel():
+                return req
+
+    def _collect(self) -> list:
+        first = self._get(0.1)
+        if first is None:
+            return []
+        batch = [first]
+        deadline = first.t_enqueue + self.max_wait
+        while len(batch) < self.max_batch_size:
+            req = self._get(max(deadline - time.perf_counter(), 0))
+            if req is None:
+                break
+            batch.append(req)
+        return batch
+
+    @staticmethod
+    def _resolve(fut: Future, result=None, exc: BaseException | None = None):
+        try:
+            if exc is not None:
+                fut.set_exception(exc)
+            else:
+                fut.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def _worker(self):
+        if self.num_threads:
+            torch.set_num_threads(self.num_threads)
+        while self._running or not self._queue.empty():
+            batch = self._collect()
+            if not batch:
+                continue
+            t0 = time.perf_counter()
+            try:
+                with torch.inference_mode():
+                    out = self.model(torch.stack([r.x for r in batch]))
+            except Exception as e:
+                for r in batch:
+                    self._resolve(r.future, exc=e)
+                continue
+            t1 = time.perf_counter()
+            for r, o in zip(batch, out):
+                self._resolve(r.future, o)
+            with self._lock:
+                s = self._stats
+                s["requests"] += len(batch)
+                s["batches"] += 1
+                s["queue_wait_ms"] += sum(t0 - r.t_enqueue for r in batch) * 1000
+                s["service_ms"] += (t1 - t0) * 1000
+                s["max_batch"] = max(s["max_batch"], len(batch))
+
+    def metrics(self, reset: bool = False) -> dict:
+        """
+        Queue wait, batch size and service time since start or last reset.
+        """
+        with self._lock:
+            s = dict(self._stats)
+            if reset:
+                self._stats = self._empty_stats()
+        n, b = s["requests"], s["batches"]
+        return {
+            "requests": n,
+            "batches": b,
+            "mean_batch": n / b if b else 0.0,
+            "max_batch": s["max_batch"],
+            "mean_queue_wait_ms": s["queue_wait_ms"] / n if n else 0.0,
+            "mean_service_ms": s["service_ms"] / b if b else 0.0,
+            "queue_size": self._queue.qsize(),
+        }
+
+    def close(self):
+        """Serve what is queued, then stop the worker."""
+        with self._submit_lock:
+            self._running = False
+        self._thread.join()
+        # the worker drains the queue before it exits, this is only a safety net
+        while True:
+            try:
+                req = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if req.future.set_running_or_notify_cancel():
+                self._resolve(req.future, exc=RuntimeError("InferenceEngine is closed"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class InferenceServer:
+    """
+    Localhost TCP front end of an ``InferenceEngine``.
+
+    One JSON object per line: ``{"input": [...]}`` -> ``{"output": [...]}``,
+    ``{"metrics": true}`` -> metrics dict, errors as ``{"error": "..."}``.
+    """
+
+    def __init__(self, engine: InferenceEngine, host="127.0.0.1", port=8765):
+        self.engine = engine
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen()
+        self.sock.settimeout(0.2)
+        self._running = True
+        self._thread = threading.Thread(target=self._accept_loop, daemon=True)
+        self._thread.start()
+        logging.info(f"InferenceServer listening on {host}:{port}")
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn, conn.makefile("rwb") as f:
+            for line in f:
+                try:
+                    req = json.loads(line)
+                    if req.get("metrics"):
+                        resp = self.engine.metrics()
+                    else:
+                        x = torch.tensor(req["input"], dtype=torch.float32)
+                        resp = {"output": self.engine.infer(x).tolist()}
+                except Exception as e:
+                    resp = {"error": str(e)}
+                f.write(json.dumps(resp).encode("utf-8") + b"\n")
+                f.flush()
+
+    def close(self):
+        self._running = False
+        self._thread.join()
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+    with InferenceEngine("MLP", max_batch_size=16, num_threads=2) as engine:
+        futures = [engine.submit(torch.randn(784)) for _ in range(100)]
+        outs = [f.result() for f in futures]
+        print(f"Got {len(outs)} outputs of shape {tuple(outs[0].shape)}")
+        print(engine.metrics())
@@ -1,43 +1,221 @@
-import subprocess
+import os
+import re
 import sys
-import importlib
+import json
+import site
+import hashlib
+import threading
+import subprocess
+import importlib.util
+import importlib.metadata as metadata
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple
 import logging
 
+from packaging.requirements import Requirement, InvalidRequirement
+
+# 导入名与发行包名不同的常见包，用于安装时把导入名换成 pip 包名
+IMPORT_TO_DIST = {
+    "cv2": "opencv-python",
+    "PIL": "pillow",
+    "sklearn": "scikit-learn",
+    "skimage": "scikit-image",
+    "yaml": "pyyaml",
+    "serial": "pyserial",
+}
+
+CACHE_FILE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "nlxpy", "deps.json"
+)
+
+
+def _site_dirs() -> List[str]:
+    """装包会改动的目录：site-packages / dist-packages"""
+    dirs = list(site.getsitepackages()) if hasattr(site, "getsitepackages") else []
+    dirs.append(site.getusersitepackages())
+    for p in sys.path:
+        # 跳过 '' (当前目录)，只要 venv 等额外的包目录
+        if p and os.path.basename(p.rstrip(os.sep)) in ("site-packages", "dist-packages"):
+            dirs.append(p)
+    return sorted(set(os.path.abspath(d) for d in dirs))
+
+
+def _env_key() -> str:
+    """当前环境的指纹：各包目录的 mtime，装/卸包后会变化"""
+    items = []
+    for d in _site_dirs():
+        try:
+            items.append(f"{d}:{os.stat(d).st_mtime_ns}")
+        except OSError:
+            pass
+    return hashlib.sha1("\n".join(items).encode("utf-8")).hexdigest()
+
+
+def _load_cache(key: str) -> dict:
+    """按解释器分别缓存，切换环境不会互相覆盖"""
+    try:
+        with open(CACHE_FILE, "r", encoding="utf-8") as f:
+            env = json.load(f).get("envs", {}).get(sys.executable, {})
+        return env.get("results", {}) if env.get("key") == key else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_cache(key: str, results: dict):
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        try:
+            with open(CACHE_FILE, "r", encoding="utf-8") as f:
+                envs = json.load(f).get("envs", {})
+        except (OSError, ValueError, AttributeError):
+            envs = {}
+        envs[sys.executable] = {"key": key, "results": results}
+        tmp = f"{CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"envs": envs}, f)
+        os.replace(tmp, CACHE_FILE)
+    except OSError as e:
+        logging.debug(f"无法写入依赖缓存: {e}")
+
+
+def _dist_version(name: str) -> str | None:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+_dists_lock = threading.Lock()
+_dists = None
+
+
+def _import_to_dists() -> dict:
+    """导入名 -> 发行包名，扫描一次所有已安装包的元数据 (加锁，多线程只扫一次)"""
+    global _dists
+    with _dists_lock:
+        if _dists is None:
+            _dists = metadata.packages_distributions()
+        return _dists
+
+
+def check_requirement(line: str) -> dict:
+    """检查一个依赖，不导入它
+
+    line 可以是 pip 要求 (如 ``numpy>=1.24``、``opencv-python-headless``)，
+    也可以是导入名 (如 ``cv2``)。
+
+    Returns:
+        dict: requirement, status ("ok" / "missing" / "mismatch" / "skip"),
+        version (已安装版本或 None), install (需要时传给 pip 的参数)
+    """
+    try:
+        req = Requirement(line)
+    except InvalidRequirement:
+        return {"requirement": line, "status": "missing", "version": None, "install": line}
+    if req.marker is not None and not req.marker.evaluate():
+        return {"requirement": line, "status": "skip", "version": None, "install": None}
+
+    name = req.name
+    # 1. 按发行包名查
+    version = _dist_version(name)
+    # 2. 按导入名查：对应的发行包，或者至少能找到模块
+    if version is None:
+        dists = _import_to_dists().get(name, [])
+        for dist in dists:
+            version = _dist_version(dist)
+            if version is not None:
+                break
+        if version is None and not dists:
+            try:
+                found = importlib.util.find_spec(name) is not None
+            except (ImportError, ValueError):
+                found = False
+            if found:
+                version = ""  # 存在但不知道版本 (标准库或未打包的模块)
+
+    install = str(req).replace(name, IMPORT_TO_DIST.get(name, name), 1)
+    if version is None:
+        status = "missing"
+    elif req.specifier and version and not req.specifier.contains(version, prereleases=True):
+        status = "mismatch"
+    else:
+        status = "ok"
+    return {
+        "requirement": line,
+        "status": status,
+        "version": version,
+        "install": install if status in ("missing", "mismatch") else None,
+    }
+
+
+def _read_requirements(path: str) -> List[str]:
+    packages = []
+    with open(path, "r") as f:
+        for line in f:
+            line = re.sub(r"\s+#.*$", "", line).strip()
+            if line and not line.startswith(("#", "-")):
+                packages.append(line)
+    return packages
+
 
 def deps_check(
-    packages: str | List[str] | Tuple[str] | None = None, 
+    packages: str | List[str] | Tuple[str] | None = None,
     requirements: str | None = None,
-    install: bool = True
+    install: bool = True,
+    use_cache: bool = True,
 ):
     """Check whether the specified packages are installed, and optionally install them if not.
 
+    Packages are looked up with ``importlib.util.find_spec`` and
+    ``importlib.metadata``, never imported. Lookups run in parallel and the
+    results are cached until the environment changes. All missing or
+    version-mismatched packages are installed with a single pip call.
+
     Args:
-        packages (str | List[str] | Tuple[str] | None): Package names to check.
+        packages (str | List[str] | Tuple[str] | None): Requirements (``numpy>=1.24``)
+            or import names (``cv2``) to check.
         requirements (str | None): Path to a requirements file to check.
         If provided, this will override the `packages` argument.
         install (bool, optional): True to install if not installed. Defaults to True.
+        use_cache (bool, optional): Reuse results cached for this environment. Defaults to True.
+
+    Returns:
+        List[str]: Requirements that were missing or mismatched.
     """
     if isinstance(packages, str):
         packages = [packages]
     if packages is None and requirements is None:
         logging.warning("未指定任何包或要求文件。")
-        return
+        return []
     if requirements:
         try:
-            with open(requirements, 'r') as f:
-                packages = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+            packages = _read_requirements(requirements)
         except FileNotFoundError:
             logging.error(f"要求文件未找到: {requirements}")
-            return
+            return []
+
+    key = _env_key()
+    cache = _load_cache(key) if use_cache else {}
+    todo = [p for p in packages if p not in cache]
+    if todo:
+        _import_to_dists()  # 在启动线程池前扫描一次
+        with ThreadPoolExecutor(max_workers=min(8, len(todo))) as ex:
+            for res in ex.map(check_requirement, todo):
+                cache[res["requirement"]] = res
+        if use_cache:
+            _save_cache(key, cache)
+
     instlist = []
     for pkg in packages:
-        try:
-            importlib.import_module(pkg)
-            logging.info(f"[✔] 已安装: {pkg}")
-        except ImportError:
+        res = cache[pkg]
+        if res["status"] == "ok":
+            logging.info(f"[✔] 已安装: {pkg} {res['version'] or ''}".rstrip())
+        elif res["status"] == "mismatch":
+            logging.warning(f"[✘] 版本不符: {pkg} (已安装 {res['version']})")
+            instlist.append(res["install"])
+        elif res["status"] == "missing":
             logging.warning(f"[✘] 未安装: {pkg}")
-            instlist.append(pkg)
+            instlist.append(res["install"])
     if instlist and install:
         logging.info(f"正在安装: {' '.join(instlist)}")
         try:
@@ -45,6 +223,7 @@ def deps_check(
             logging.info("安装完成")
         except subprocess.CalledProcessError as e:
             logging.error(f"安装失败: {e}")
+    return instlist
 
 
 if __name__ == "__main__":
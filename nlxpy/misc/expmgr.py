@@ -6,24 +6,368 @@
 # @description: Experiment manager for creating unique experiment directories
 
 import os
+import csv
+import copy
+import json
 import time
+import random
+import logging
 import datetime
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _read_hint(path):
+    try:
+        with open(path, "r") as f:
+            return max(int(f.read().strip() or 0), 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_hint(path, value):
+    # 写临时文件再 rename，读者不会看到写了一半的内容
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".hint")
+        with os.fdopen(fd, "w") as f:
+            f.write(str(value))
+        os.replace(tmp, path)
+    except OSError:
+        pass
 
 
 def mkexpdir(project="runs", prefix="", withdate=False):
-    """自动创建 {project}/{prefix}X 文件夹，X 为递增数字"""
+    """自动创建 {project}/{prefix}X 文件夹，X 为递增数字
+
+    用 os.mkdir 原子地占用目录，多个进程同时启动也不会拿到同一个目录；
+    下一个编号缓存在 {project}/.{prefix}next 中，通常一次 mkdir 即可，
+    不必从 0 开始逐个探测。编号只增不减，删除旧目录后不会复用其编号。
+    """
     os.makedirs(f"{project}", exist_ok=True)
-    i = 0
     if withdate:
         date_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         prefix = f"{prefix}_{date_str}_"
+        hint_file = None  # 带日期的前缀几乎不会重复，不缓存
+        i = 0
+    else:
+        hint_file = f"{project}/.{prefix}next"
+        i = _read_hint(hint_file)
     while True:
         run_folder = f"{project}/{prefix}{i}"
-        if not os.path.exists(run_folder):
-            os.makedirs(run_folder)
-            return run_folder
-        i += 1
-    return None
+        try:
+            os.mkdir(run_folder)
+        except FileExistsError:
+            i += 1
+            continue
+        if hint_file:
+            _write_hint(hint_file, i + 1)
+        return run_folder
+
+
+class RunLogger:
+    """缓冲标量指标，成批追加到 CSV 文件
+
+    每 flush_every 行或 flush_secs 秒写一次盘，而不是每步一次；
+    出现新的指标名时会重写表头（少见）。
+
+    Usage:
+        with RunLogger(mkexpdir()) as logger:
+            for step in range(1000):
+                logger.log(step, loss=..., lr=...)
+    """
+
+    def __init__(self, run_dir, filename="metrics.csv", flush_every=1000, flush_secs=30.0, fsync=False):
+        self.path = os.path.join(run_dir, filename)
+        self.flush_every = flush_every
+        self.flush_secs = flush_secs
+        self.fsync = fsync
+        self._rows = []
+        self._last_flush = time.monotonic()
+        self._columns = self._read_header()
+
+    def _read_header(self):
+        try:
+            with open(self.path, "r", newline="") as f:
+                return next(csv.reader(f), [])
+        except FileNotFoundError:
+            return []
+
+    def log(self, step, **scalars):
+        """记录一步的标量指标"""
+        row = {"step": step, "time": time.time()}
+        row.update({k: float(v) for k, v in scalars.items()})
+        self._rows.append(row)
+        if (
+            len(self._rows) >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_secs
+        ):
+            self.flush()
+
+    def _rewrite(self, columns):
+        """表头变化时把已有内容按新表头重写"""
+        old = []
+        if os.path.exists(self.path):
+            with open(self.path, "r", newline="") as f:
+                old = list(csv.DictReader(f))
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(old)
+        os.replace(tmp, self.path)
+
+    def flush(self):
+        """把缓冲的行一次写入文件"""
+        self._last_flush = time.monotonic()
+        if not self._rows:
+            return
+        columns = list(self._columns)
+        for row in self._rows:
+            columns.extend(k for k in row if k not in columns)
+        if columns != self._columns:
+            self._rewrite(columns)
+            self._columns = columns
+        with open(self.path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self._columns)
+            writer.writerows(self._rows)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self._rows.clear()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _snapshot(obj):
+    """递归地把 state_dict 中的张量复制到 CPU，其余对象原样保留
+
+    容器用 copy.copy 复制后再替换元素，保留 defaultdict 的工厂、
+    state_dict 的 _metadata 等属性；namedtuple 按字段重建。
+    """
+    import torch
+
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to("cpu", copy=True)
+    if isinstance(obj, dict):
+        out = copy.copy(obj)
+        for k in list(out):
+            out[k] = _snapshot(out[k])
+        return out
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        return type(obj)(*(_snapshot(v) for v in obj))
+    if isinstance(obj, list):
+        out = copy.copy(obj)
+        out[:] = [_snapshot(v) for v in obj]
+        return out
+    if isinstance(obj, tuple):
+        return type(obj)(_snapshot(v) for v in obj)
+    return obj
+
+
+def rng_state():
+    """当前随机种子 (nlxpy.dl.rand) 与各随机数生成器状态，用于断点续训"""
+    import numpy as np
+    import torch
+    from ..dl.rand import get_random_seed
+
+    state = {
+        "seed": get_random_seed(),
+        "python": random.getstate(),
+        "numpy": np.random.get_state(),
+        "torch": torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state["cuda"] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def restore_rng_state(state):
+    """恢复 rng_state() 保存的状态"""
+    import numpy as np
+    import torch
+    from ..dl import rand
+
+    rand.randseed = state["seed"]
+    random.setstate(state["python"])
+    np.random.set_state(state["numpy"])
+    torch.set_rng_state(state["torch"])
+    if "cuda" in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state["cuda"])
+
+
+class CheckpointManager:
+    """异步保存检查点到 {run_dir}/{subdir}
+
+    前台只把 state_dict 复制到 CPU 内存，序列化和写盘在后台线程完成，
+    先写临时文件再原子 rename。同时最多有 max_pending 份快照在内存中，
+    写盘跟不上时 save 会等待，而不是无限堆积模型副本。保留最近 keep_last 个和指标最好的 keep_best 个，
+    记录在 checkpoints.json 中。每个检查点同时保存随机种子和 RNG 状态。
+
+    Usage:
+        ckpt = CheckpointManager(mkexpdir(), keep_last=3, keep_best=1, mode="min")
+        ckpt.save({"model": model.state_dict(), "optim": optim.state_dict()}, step, metric=val_loss)
+        ...
+        ckpt.close()
+        state = ckpt.load_latest()
+    """
+
+    def __init__(self, run_dir, subdir="weights", keep_last=3, keep_best=1, mode="min", max_pending=1):
+        assert mode in ["min", "max"], f"Mode {mode} is not supported"
+        self.dir = os.path.join(run_dir, subdir)
+        os.makedirs(self.dir, exist_ok=True)
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.mode = mode
+        self.timings = []
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ckpt")
+        self._closed = False
+        self._pending = threading.BoundedSemaphore(max(1, max_pending))
+        self._index_path = os.path.join(self.dir, "checkpoints.json")
+        try:
+            with open(self._index_path, "r") as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = []
+
+    def save(self, state, step, metric=None):
+        """保存检查点，返回后台写盘的 Future
+
+        Args:
+            state: 要保存的字典，例如 {"model": model.state_dict(), ...}
+            step: 训练步数/轮数，用于命名和保留最近的检查点
+            metric: 可选指标，用于保留最好的检查点
+        """
+        t0 = time.perf_counter()
+        # 背压：等前面的快照写完再复制新的一份
+        self._pending.acquire()
+        wait = time.perf_counter() - t0
+        try:
+            metric = None if metric is None else float(metric)
+            snapshot = {
+                "state": _snapshot(state),
+                "step": step,
+                "metric": metric,
+                "rng": rng_state(),
+            }
+            fg = time.perf_counter() - t0
+            return self._pool.submit(self._write, snapshot, step, metric, fg, wait)
+        except BaseException:
+            self._pending.release()
+            raise
+
+    def _write(self, snapshot, step, metric, fg, wait):
+        try:
+            return self._write_snapshot(snapshot, step, metric, fg, wait)
+        finally:
+            self._pending.release()
+
+    def _write_snapshot(self, snapshot, step, metric, fg, wait):
+        import torch
+
+        t0 = time.perf_counter()
+        name = f"ckpt_{step:08d}.pt" if isinstance(step, int) else f"ckpt_{step}.pt"
+        path = os.path.join(self.dir, name)
+        tmp = path + ".tmp"
+        try:
+            torch.save(snapshot, tmp)
+            os.replace(tmp, path)
+            with self._lock:
+                self._index = [c for c in self._index if c["file"] != name]
+                self._index.append({"file": name, "step": step, "metric": metric})
+                self._apply_retention()
+                _write_json(self._index_path, self._index)
+        except Exception as e:
+            logging.error(f"Failed to save checkpoint {path}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        bg = time.perf_counter() - t0
+        self.timings.append(
+            {
+                "step": step,
+                "foreground_ms": fg * 1000,
+                "wait_ms": wait * 1000,
+                "background_ms": bg * 1000,
+            }
+        )
+        logging.debug(
+            f"Checkpoint {name}: foreground {fg * 1000:.1f} ms, background {bg * 1000:.1f} ms"
+        )
+        return path
+
+    def _apply_retention(self):
+        keep = set()
+        by_step = sorted(self._index, key=lambda c: c["step"])
+        keep.update(c["file"] for c in by_step[-self.keep_last :] if self.keep_last)
+        scored = [c for c in self._index if c["metric"] is not None]
+        scored.sort(key=lambda c: c["metric"], reverse=self.mode == "max")
+        keep.update(c["file"] for c in scored[: self.keep_best])
+        for c in self._index:
+            if c["file"] not in keep:
+                try:
+                    os.remove(os.path.join(self.dir, c["file"]))
+                except FileNotFoundError:
+                    pass
+        self._index = [c for c in self._index if c["file"] in keep]
+
+    def checkpoints(self):
+        """已保留的检查点，按步数排序"""
+        with self._lock:
+            return sorted(self._index, key=lambda c: c["step"])
+
+    def best(self):
+        """指标最好的检查点路径，没有则为 None"""
+        with self._lock:
+            scored = [c for c in self._index if c["metric"] is not None]
+        if not scored:
+            return None
+        pick = max if self.mode == "max" else min
+        return os.path.join(self.dir, pick(scored, key=lambda c: c["metric"])["file"])
+
+    def load_latest(self, restore_rng=True, map_location="cpu"):
+        """加载最近的检查点，默认同时恢复 RNG 状态；没有则返回 None"""
+        import torch
+
+        self.wait()
+        ckpts = self.checkpoints()
+        if not ckpts:
+            return None
+        path = os.path.join(self.dir, ckpts[-1]["file"])
+        ckpt = torch.load(path, map_location=map_location, weights_only=False)
+        if restore_rng:
+            restore_rng_state(ckpt["rng"])
+        return ckpt
+
+    def wait(self):
+        """等待已提交的保存全部完成"""
+        if not self._closed:
+            self._pool.submit(lambda: None).result()
+
+    def close(self):
+        self._closed = True
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
 
 
 if __name__ == "__main__":
@@ -36,3 +380,7 @@ if __name__ == "__main__":
     # This should create two folders with different timestamps
     run_folder3 = mkexpdir(project="runs", prefix="test")
     print(f"Created run folder without date: {run_folder3}")
+    with RunLogger(run_folder3) as logger:
+        for step in range(10):
+            logger.log(step, loss=1.0 / (step + 1))
+    print(f"Logged metrics to {logger.path}")
@@ -1,9 +1,9 @@
 from setuptools import setup, find_packages
 
-deps = ["numpy"]
+deps = ["numpy", "packaging"]
 cv_deps = ["opencv-python-headless", "numpy", "pillow", "scikit-image"]
 misc_deps = ["pyserial"]
-dl_deps = ["torch", "torchvision", "torchaudio", "tqdm", "numpy", "scikit-learn"]
+dl_deps = ["torch", "torchvision", "torchaudio", "tqdm", "numpy", "scikit-learn", "pyyaml"]
 all_deps = cv_deps + misc_deps + dl_deps
 all_deps = list(set(all_deps))  # 去重
 
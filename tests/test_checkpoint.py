@@ -0,0 +1,74 @@
+import os
+import random
+from collections import defaultdict, namedtuple
+
+import pytest
+
+torch = pytest.importorskip("torch")
+np = pytest.importorskip("numpy")
+
+from nlxpy.dl.rand import get_random_seed, set_random_seed
+from nlxpy.misc.expmgr import CheckpointManager, _snapshot
+
+
+def test_snapshot_keeps_container_types():
+    Pair = namedtuple("Pair", "a b")
+    dd = defaultdict(list, w=torch.ones(2))
+    sd = torch.nn.Linear(2, 2).state_dict()
+    snap = _snapshot({"pair": Pair(torch.zeros(1), 3), "dd": dd, "sd": sd})
+    assert isinstance(snap["pair"], Pair) and snap["pair"].b == 3
+    assert isinstance(snap["dd"], defaultdict) and snap["dd"].default_factory is list
+    assert hasattr(snap["sd"], "_metadata")
+    dd["w"].add_(1)
+    assert torch.equal(snap["dd"]["w"], torch.ones(2))  # a copy, not a view
+
+
+def test_save_retention_and_atomic_files(tmp_path):
+    model = torch.nn.Linear(3, 1)
+    with CheckpointManager(str(tmp_path), keep_last=2, keep_best=1, mode="min") as ckpt:
+        for step, metric in enumerate([0.5, 0.1, 0.9, 0.8, 0.7]):
+            ckpt.save({"model": model.state_dict()}, step, metric=metric)
+        ckpt.wait()
+        kept = [c["step"] for c in ckpt.checkpoints()]
+        assert kept == [1, 3, 4]
+        assert ckpt.best().endswith("ckpt_00000001.pt")
+    files = sorted(os.listdir(tmp_path / "weights"))
+    assert not [f for f in files if f.endswith(".tmp")]
+    assert files == ["checkpoints.json", "ckpt_00000001.pt", "ckpt_00000003.pt", "ckpt_00000004.pt"]
+    assert len(ckpt.timings) == 5 and all("background_ms" in t for t in ckpt.timings)
+
+
+def test_rng_round_trip(tmp_path):
+    set_random_seed(7)
+    ckpt = CheckpointManager(str(tmp_path))
+    ckpt.save({"x": torch.zeros(1)}, 0).result()
+    expect = (torch.rand(3), np.random.rand(), random.random())
+    set_random_seed(99)
+    state = ckpt.load_latest()
+    assert get_random_seed() == 7 and state["step"] == 0
+    assert torch.equal(torch.rand(3), expect[0])
+    assert np.random.rand() == expect[1] and random.random() == expect[2]
+    ckpt.close()
+
+
+def test_in_flight_snapshots_bounded(tmp_path, monkeypatch):
+    import threading
+
+    gate = threading.Event()
+    ckpt = CheckpointManager(str(tmp_path), max_pending=1)
+    real = ckpt._write_snapshot
+
+    def slow(*args):
+        gate.wait(5)
+        return real(*args)
+
+    monkeypatch.setattr(ckpt, "_write_snapshot", slow)
+    ckpt.save({"x": torch.zeros(1)}, 0)
+    blocked = threading.Thread(target=ckpt.save, args=({"x": torch.zeros(1)}, 1))
+    blocked.start()
+    blocked.join(0.2)
+    assert blocked.is_alive()  # waits for the first write
+    gate.set()
+    blocked.join(5)
+    ckpt.close()
+    assert [c["step"] for c in ckpt.checkpoints()] == [0, 1]
@@ -0,0 +1,48 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+from nlxpy.dl.dataset import AugmentPipeline
+
+CFG = {
+    "seed": 0,
+    "steps": [
+        {"type": "to_float"},
+        {"type": "hflip", "p": 0.5},
+        {"type": "crop", "size": [6, 6], "padding": 1},
+        {"type": "color_jitter", "brightness": 0.2, "contrast": 0.2, "saturation": 0.2},
+        {"type": "normalize", "mean": [0.5, 0.5, 0.5], "std": [0.5, 0.5, 0.5]},
+    ],
+}
+
+
+def _batch():
+    return torch.randint(0, 256, (4, 3, 8, 8), dtype=torch.uint8, generator=torch.Generator().manual_seed(1))
+
+
+def test_shapes_and_timings():
+    pipe = AugmentPipeline.from_config(CFG)
+    out = pipe(_batch(), key=0)
+    assert out.shape == (4, 3, 6, 6) and out.dtype == torch.float32
+    assert [t["step"] for t in pipe.timings()][0] == "ToFloat"
+
+
+def test_key_reproducible_across_instances():
+    # two instances stand in for two DataLoader workers
+    a, b = AugmentPipeline.from_config(CFG), AugmentPipeline.from_config(CFG)
+    x = _batch()
+    assert torch.equal(a(x, indices=[4, 5, 6, 7]), b(x, indices=[4, 5, 6, 7]))
+    assert torch.equal(a(x, key=a.batch_key(x)), b(x, key=b.batch_key(x)))
+    with pytest.raises(ValueError):
+        a(x)  # no silent content hashing
+    assert not torch.equal(a(x, key=1), a(x, key=2))
+    b.set_epoch(1)
+    assert not torch.equal(a(x, key=1), b(x, key=1))
+
+
+def test_color_jitter_does_not_mutate_input():
+    pipe = AugmentPipeline.from_config({"steps": [{"type": "color_jitter"}]})
+    x = torch.full((2, 3, 4, 4), 2.0)
+    pipe(x, key=0)
+    assert (x == 2.0).all()
@@ -0,0 +1,61 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from nlxpy.misc import deps
+from nlxpy.misc.deps import check_requirement, deps_check
+
+
+@pytest.fixture(autouse=True)
+def _tmp_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(deps, "CACHE_FILE", str(tmp_path / "deps.json"))
+
+
+def test_check_requirement_without_import():
+    # fresh interpreter, popping yaml here would leave two copies loaded
+    code = (
+        "import sys\n"
+        "from nlxpy.misc.deps import check_requirement\n"
+        "assert check_requirement('yaml')['status'] == 'ok'\n"
+        "assert 'yaml' not in sys.modules, 'yaml imported'\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_version_specifiers():
+    assert check_requirement("pytest>=1.0")["status"] == "ok"
+    res = check_requirement("pytest<1.0")
+    assert res["status"] == "mismatch" and res["install"] == "pytest<1.0"
+    res = check_requirement("surely-not-a-package-xyz>=1.0")
+    assert res["status"] == "missing"
+
+
+def test_deps_check_collects_and_caches(tmp_path):
+    missing = deps_check(["json", "pytest<1.0", "surely-not-a-package-xyz"], install=False)
+    assert missing == ["pytest<1.0", "surely-not-a-package-xyz"]
+    assert (tmp_path / "deps.json").exists()
+    assert deps_check(["json"], install=False) == []
+
+
+def test_env_key_ignores_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend("")
+    key = deps._env_key()
+    (tmp_path / "new_file.txt").write_text("x")
+    assert deps._env_key() == key
+
+
+def test_cache_kept_per_interpreter(monkeypatch):
+    exe = sys.executable
+    deps._save_cache("k1", {"a": 1})
+    monkeypatch.setattr(sys, "executable", "/other/python")
+    deps._save_cache("k2", {"b": 2})
+    assert deps._load_cache("k2") == {"b": 2}
+    monkeypatch.setattr(sys, "executable", exe)
+    assert deps._load_cache("k1") == {"a": 1}
@@ -0,0 +1,26 @@
+import csv
+from concurrent.futures import ThreadPoolExecutor
+
+from nlxpy.misc.expmgr import mkexpdir, RunLogger
+
+
+def test_mkexpdir_unique_under_concurrency(tmp_path):
+    project = str(tmp_path / "runs")
+    with ThreadPoolExecutor(8) as ex:
+        dirs = list(ex.map(lambda _: mkexpdir(project, prefix="exp"), range(32)))
+    assert len(set(dirs)) == 32
+    assert mkexpdir(project, prefix="exp") == f"{project}/exp32"
+
+
+def test_run_logger_buffers_and_grows_columns(tmp_path):
+    logger = RunLogger(str(tmp_path), flush_every=10, flush_secs=1e9)
+    for step in range(5):
+        logger.log(step, loss=step)
+    assert not (tmp_path / "metrics.csv").exists()
+    logger.flush()
+    logger.log(5, loss=5, acc=0.5)
+    logger.close()
+    with open(tmp_path / "metrics.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 6
+    assert rows[0]["acc"] == "" and rows[5]["acc"] == "0.5"
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from nlxpy.dl.model.bench import benchmark_model, benchmark_registry, percentile, save_results
+
+
+def test_percentile():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+
+
+def test_sweep_rows_and_memory_columns():
+    res = benchmark_model("MLP", batch_sizes=(1, 4), modes=("eval", "train"), iters=3, warmup=1)
+    # train + inference_mode is skipped
+    assert [(r["batch_size"], r["mode"]) for r in res] == [(1, "eval"), (4, "eval")]
+    assert all(r["p50_ms"] > 0 and "rss_delta_mb" in r for r in res)
+    assert all(r["peak_rss_scope"] == "process" for r in res)
+
+
+def test_channels_last_and_quantize_skips():
+    res = benchmark_registry(
+        ["Flatten", "Conv2dBlock"],
+        batch_sizes=(2,),
+        channels_last=(False, True),
+        quantize=(False, True),
+        iters=2,
+        warmup=1,
+    )
+    assert {r["model"] for r in res} == {"Flatten", "Conv2dBlock"}
+    assert any(r["channels_last"] for r in res)
+    # neither model has nn.Linear, no row may claim int8
+    assert not any(r["quantize"] for r in res)
+
+
+def test_save_results(tmp_path):
+    res = benchmark_model("MLP", batch_sizes=(1,), iters=2, warmup=1, profile=True)
+    save_results(res, str(tmp_path / "r.json"))
+    save_results(res, str(tmp_path / "r.csv"))
+    assert json.loads((tmp_path / "r.json").read_text())[0]["ops"]
+    assert (tmp_path / "r.csv").read_text().startswith("model,")
@@ -0,0 +1,84 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from nlxpy.dl.model import Model
+from nlxpy.dl.model.builder import clear_cache
+from nlxpy.dl.rand import set_random_seed
+
+
+@pytest.fixture(autouse=True)
+def _clear():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def _params(net):
+    return torch.cat([p.detach().flatten() for p in net.parameters()])
+
+
+def test_lenet_from_zoo():
+    net = Model.from_config("LeNet").eval()
+    assert net(torch.randn(2, 1, 28, 28)).shape == (2, 10)
+
+
+def test_channels_last_forward():
+    net = Model.from_config("LeNet", channels_last=True).eval()
+    x = torch.randn(2, 1, 28, 28).contiguous(memory_format=torch.channels_last)
+    assert net(x).shape == (2, 10)
+
+
+def test_cached_build_follows_seed():
+    set_random_seed(0)
+    a = Model.from_config("LeNet")
+    set_random_seed(1)
+    b = Model.from_config("LeNet")
+    set_random_seed(0)
+    c = Model.from_config("LeNet")
+    assert not torch.equal(_params(a), _params(b))
+    assert torch.equal(_params(a), _params(c))
+
+
+def test_cached_build_keeps_block_init():
+    @Model.register("_test_zero_init")
+    class ZeroInit(torch.nn.Linear):
+        def __init__(self, n=4):
+            super().__init__(n, n)
+            torch.nn.init.zeros_(self.weight)
+
+    cfg = {"blocks": [{"block": "_test_zero_init"}]}
+    try:
+        for _ in range(2):  # miss, then hit
+            net = Model.from_config(cfg)
+            assert not net.layers[0].weight.any()
+    finally:
+        Model.unregister("_test_zero_init")
+
+
+def test_flatten_keeps_batch_dim():
+    flat = Model.build("Flatten")
+    assert flat(torch.randn(5)).shape == (5, 1)
+    x = torch.randn(2, 3, 4, 4).contiguous(memory_format=torch.channels_last)
+    assert torch.equal(flat(x), x.contiguous().view(2, -1))
+
+
+def test_skip_connection_add():
+    cfg = {
+        "model": {"input_shape": [8]},
+        "blocks": [
+            {"block": "MLP", "name": "a", "args": {"input_size": "auto", "out_classes": 8, "hidden_sizes": []}},
+            {"block": "MLP", "name": "b", "args": {"input_size": "auto", "out_classes": 8, "hidden_sizes": []}},
+            {"from": ["a", -1], "merge": "add"},
+        ],
+    }
+    net = Model.from_config(cfg).eval()
+    x = torch.randn(3, 8)
+    a = net.layers[0](x)
+    assert torch.allclose(net(x), a + net.layers[1](a))
+
+
+def test_from_out_of_range():
+    cfg = {"blocks": [{"block": "Flatten", "from": -3}]}
+    with pytest.raises(ValueError):
+        Model.from_config(cfg)
@@ -0,0 +1,41 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+nn = torch.nn
+
+from nlxpy.dl.model import Model, optimize_for_inference
+from nlxpy.dl.model.optimize import EquivalenceError, check_equivalence
+
+
+def _kinds(model):
+    return [type(m) for m in model.modules()]
+
+
+def test_mlp_dropout_stripped_and_relu_fused():
+    model = Model.build("MLP", input_size=16, out_classes=4, hidden_sizes=[8, 8])
+    opt = optimize_for_inference(model, example_input=torch.randn(5, 16))
+    kinds = _kinds(opt)
+    assert nn.Dropout not in kinds and nn.Identity not in kinds
+    assert len(opt.model) == 3  # LinearReLU, LinearReLU, Linear
+
+
+def test_convblock_bn_folded_inplace_checked():
+    model = Model.build("Conv2dBlock", in_channels=3, out_channels=8, cfg=[[8, 3, 1, 1]])
+    model.eval()
+    for _ in range(2):  # non-trivial running stats
+        model.train()(torch.randn(4, 3, 8, 8))
+    opt = optimize_for_inference(model, example_input=torch.randn(2, 3, 8, 8), inplace=True)
+    kinds = _kinds(opt)
+    assert nn.BatchNorm2d not in kinds and nn.Dropout not in kinds
+
+
+def test_dropout_between_conv_and_bn_does_not_block_folding():
+    seq = nn.Sequential(nn.Conv2d(3, 4, 3), nn.Dropout(0.1), nn.BatchNorm2d(4), nn.ReLU())
+    opt = optimize_for_inference(seq, example_input=torch.randn(2, 3, 6, 6))
+    assert len(opt) == 1
+
+
+def test_mismatch_raises():
+    x = torch.randn(2, 4)
+    with pytest.raises(EquivalenceError):
+        check_equivalence(nn.Linear(4, 2), nn.Linear(4, 2), x)
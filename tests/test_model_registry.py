@@ -0,0 +1,66 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+from nlxpy.dl.model import Model
+
+
+def test_builtin_models_listed_without_torch():
+    names = [m["name"] for m in Model.get_registered_models(proc=True)]
+    assert {"MLP", "Conv2dBlock", "Flatten"} <= set(names)
+    assert Model.info("MLP")["target"] == "nlxpy.dl.model.module:MLP"
+    # fresh interpreter, earlier tests may have imported torch already
+    code = (
+        "import sys\n"
+        "from nlxpy.dl.model import Model\n"
+        "Model.get_registered_models(proc=True)\n"
+        "Model.info('MLP')\n"
+        "assert 'torch' not in sys.modules, 'torch imported'\n"
+        "assert 'nlxpy.dl.model.module' not in sys.modules, 'module imported'\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+
+
+def test_register_returns_class_and_build():
+    @Model.register("_test_dummy", note="dummy", input_spec=[3])
+    class Dummy:
+        def __init__(self, k=1):
+            self.k = k
+
+    try:
+        assert Dummy.__name__ == "Dummy"
+        assert Model.build("_test_dummy", k=5).k == 5
+        assert Model.info("_test_dummy")["input_spec"] == [3]
+        with pytest.raises(ValueError):
+            Model.register("_test_dummy")(type("Other", (), {}))
+    finally:
+        Model.unregister("_test_dummy")
+
+
+def test_lazy_entry_imported_on_build():
+    Model.register_lazy("_test_lazy", "collections:OrderedDict")
+    try:
+        assert Model.info("_test_lazy")["loaded"] is False
+        assert Model.build("_test_lazy", a=1) == {"a": 1}
+        assert Model.info("_test_lazy")["loaded"] is True
+    finally:
+        Model.unregister("_test_lazy")
+
+
+def test_reregister_resolved_class():
+    Model.register_lazy("_test_rereg", "collections:OrderedDict")
+    try:
+        from collections import OrderedDict
+
+        assert Model.get("_test_rereg") is OrderedDict
+        # e.g. importlib.reload of the module registering it
+        assert Model.register("_test_rereg")(OrderedDict) is OrderedDict
+        assert Model.register("_test_rereg")(OrderedDict) is OrderedDict
+    finally:
+        Model.unregister("_test_rereg")
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from nlxpy.dl.model.serve import InferenceEngine
+
+
+class Slow(torch.nn.Module):
+    """Doubles the input, blocks until ``gate`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+
+    def forward(self, x):
+        self.gate.wait(5)
+        return x * 2
+
+
+def test_batches_and_results():
+    model = Slow()
+    with InferenceEngine(model=model, max_batch_size=8, max_wait_ms=50) as engine:
+        xs = [torch.full((3,), float(i)) for i in range(16)]
+        futures = [engine.submit(x) for x in xs]
+        model.gate.set()
+        for x, f in zip(xs, futures):
+            assert torch.equal(f.result(5), x * 2)
+        m = engine.metrics()
+    assert m["requests"] == 16 and m["max_batch"] > 1
+
+
+def test_cancelled_request_does_not_kill_worker():
+    model = Slow()
+    with InferenceEngine(model=model, max_batch_size=1, max_wait_ms=0) as engine:
+        first = engine.submit(torch.ones(2))
+        time.sleep(0.1)  # the worker is blocked on the first batch
+        dropped = engine.submit(torch.ones(2))
+        assert dropped.cancel()
+
+        async def timed_out():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(engine.infer_async(torch.ones(2)), 0.05)
+
+        asyncio.run(timed_out())
+        model.gate.set()
+        assert torch.equal(first.result(5), torch.full((2,), 2.0))
+        assert torch.equal(engine.infer(torch.ones(2), timeout=5), torch.full((2,), 2.0))
+        assert engine.metrics()["requests"] == 2
+
+
+def test_close_serves_queue_then_rejects():
+    model = Slow()
+    engine = InferenceEngine(model=model, max_batch_size=4)
+    futures = [engine.submit(torch.ones(2)) for _ in range(6)]
+    model.gate.set()
+    engine.close()
+    assert all(f.done() and not f.exception() for f in futures)
+    with pytest.raises(RuntimeError):
+        engine.submit(torch.ones(2))